@@ -1,14 +1,10 @@
 import os
 import re
 import time
-import pandas as pd
-import requests
-import datetime
+from wigle_client import WigleClient
 
-# Constants for API requests
-BASE_URL = "https://api.wigle.net/api/v2/"
-REQUEST_DELAY = 5
-MAX_RETRIES = 3
+# Pattern for API token validation
+TOKEN_PATTERN = re.compile(r"[\w=-]*")
 
 API_KEY = 'INPUT YOUR API KEY'
 
@@ -22,7 +18,7 @@ def is_valid_token(token):
     Returns:
         bool: True if the token is valid, False otherwise.
     """
-    return bool(re.fullmatch(r"[\w\-_=]*", token))
+    return TOKEN_PATTERN.fullmatch(token) is not None
 
 
 def get_headers():
@@ -32,7 +28,7 @@ def get_headers():
     Returns:
         dict: The headers with the specific Authorization header.
     """
-    return {"Your Authorizaiton Header"}
+    return {"Authorization": f"Basic {API_KEY}"}
 
 
 def send_request(api_type, headers, only_mine, last_updated):
@@ -51,81 +47,24 @@ def send_request(api_type, headers, only_mine, last_updated):
     api_endpoints = ['bluetooth/search', 'cell/search', 'network/search']
     api_endpoint = api_endpoints[api_type]
     
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = os.path.join("output", f"{api_endpoint.split('/')[0]}_{timestamp}.csv")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    filename = os.path.join("output", f"{api_endpoint.split('/')[0]}_{timestamp}.parquet")
 
-    current_count = 0
-    total_count = None
-    retries = 0
+    client = WigleClient(headers, api_endpoint)
 
     query_params = {
         "onlymine": str(only_mine).lower(),
-        "first": 100,
         "lastupdt": last_updated
     }
 
-    print(f"Retrieving results from {BASE_URL + api_endpoint}...")
+    print(f"Retrieving results from {client.url}...")
 
     # Ensure the output folder exists
     os.makedirs("output", exist_ok=True)
 
-    # Open the file for writing with UTF-8 encoding
-    with open(filename, "a", encoding="utf-8") as f:
-        while retries < MAX_RETRIES:
-            try:
-                response = requests.get(BASE_URL + api_endpoint, params=query_params, headers=headers)
-                status_code = response.status_code
+    saved_count = client.save(filename, **query_params)
 
-                if status_code == 200:
-                    data = response.json()
-                    results = data["results"]
-                    current_count += len(results)
-
-                    if total_count is None:
-                        total_count = data["totalResults"]
-
-                    print(f"Retrieved {current_count} out of {total_count} results")
-
-                    df = pd.DataFrame(results)
-                    df.to_csv(f, index=False, header=f.tell() == 0, escapechar="\\")
-
-                    if current_count >= total_count:
-                        break
-
-                    query_params["start"] = current_count
-                    time.sleep(REQUEST_DELAY)
-
-                elif status_code == 401:
-                    print("Unauthorized. Check your API key.")
-                    break
-
-                elif status_code == 429:
-                    print("Too many requests. Saving the current results.")
-                    break
-
-                else:
-                    print(f"Error {status_code}: Failed to retrieve results.")
-                    break
-
-            except requests.exceptions.Timeout:
-                print("Request timed out. Retrying...")
-                retries += 1
-                time.sleep(REQUEST_DELAY)
-
-            except requests.exceptions.TooManyRedirects:
-                print("Too many redirects. Terminating request.")
-                break
-
-            except requests.exceptions.ConnectionError:
-                print("Connection Error. Retrying...")
-                retries += 1
-                time.sleep(REQUEST_DELAY)
-
-            except Exception as e:
-                print(f"An error occurred: {e}")
-                break
-
-        print(f"All results retrieved from {BASE_URL + api_endpoint}. Total results: {current_count}")
+    print(f"Finished {client.url}. Total results saved: {saved_count}")
 
 
 def main():
@@ -1,39 +1,77 @@
 import os
-import csv
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Columns needed to build a Placemark
+KML_COLUMNS = ['trilat', 'trilong', 'id']
+# Number of rows to convert at a time
+CHUNK_SIZE = 65536
+# Size of the KML output buffer in bytes
+WRITE_BUFFER_SIZE = 1 << 20
+
+def read_kml_columns(csv_file):
+    # Read only the relevant columns from the Parquet file written by the scrapers, in chunks
+    if csv_file.endswith('.parquet'):
+        for batch in pq.ParquetFile(csv_file).iter_batches(batch_size=CHUNK_SIZE, columns=KML_COLUMNS):
+            chunk = batch.to_pandas()
+            # Match the CSV reader: every value as text, missing values empty
+            yield chunk.astype(str).where(chunk.notna(), '')
+        return
+    # Read only the relevant columns from the CSV file, in chunks
+    try:
+        chunks = pd.read_csv(csv_file, usecols=KML_COLUMNS, dtype=str, keep_default_na=False,
+                             chunksize=CHUNK_SIZE)
+    except pd.errors.EmptyDataError:
+        # An empty file (e.g. left behind by a failed scrape) has no rows
+        return
+    with chunks:
+        yield from chunks
 
 def csv_to_kml(csv_file, kml_file):
-    # Open CSV file for reading
-    with open(csv_file, 'r') as csvfile:
-        csvreader = csv.DictReader(csvfile)
-        # Open KML file for writing
-        with open(kml_file, 'w') as kmlfile:
-            kmlfile.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-            kmlfile.write('<kml xmlns="http://www.opengis.net/kml/2.2">\n')
-            kmlfile.write('<Document>\n')
-            for row in csvreader:
-                # Extract relevant columns
-                lat, lon = row['trilat'], row['trilong']
-                network_id = row['id']
-                # Write Placemark with relevant information
-                kmlfile.write('<Placemark>\n')
-                kmlfile.write('<name>{}</name>\n'.format(network_id))
-                kmlfile.write('<description>ID: {}</description>\n'.format(network_id))
-                kmlfile.write('<Point>\n')
-                kmlfile.write('<coordinates>{},{},0</coordinates>\n'.format(lon, lat))
-                kmlfile.write('</Point>\n')
-                kmlfile.write('</Placemark>\n')
-            kmlfile.write('</Document>\n')
-            kmlfile.write('</kml>\n')
+    # Open KML file for writing, encoding each chunk to UTF-8 once
+    with open(kml_file, 'wb', buffering=WRITE_BUFFER_SIZE) as kmlfile:
+        kmlfile.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+        kmlfile.write(b'<kml xmlns="http://www.opengis.net/kml/2.2">\n')
+        kmlfile.write(b'<Document>\n')
+        for chunk in read_kml_columns(csv_file):
+            # Build the Placemarks for the whole chunk at once
+            placemarks = ('<Placemark>\n'
+                          '<name>' + chunk['id'] + '</name>\n'
+                          '<description>ID: ' + chunk['id'] + '</description>\n'
+                          '<Point>\n'
+                          '<coordinates>' + chunk['trilong'] + ',' + chunk['trilat'] + ',0</coordinates>\n'
+                          '</Point>\n'
+                          '</Placemark>\n')
+            kmlfile.write(placemarks.str.cat().encode('utf-8'))
+        kmlfile.write(b'</Document>\n')
+        kmlfile.write(b'</kml>\n')
 
 def convert_csv_files_to_kml(input_dir):
-    # Iterate over files in the input directory
+    # Collect the CSV and Parquet files in the input directory and their KML outputs
+    csv_files, kml_files = [], []
     for file_name in os.listdir(input_dir):
-        if file_name.endswith('.csv'):
-            csv_file = os.path.join(input_dir, file_name)
-            kml_file = os.path.join(input_dir, os.path.splitext(file_name)[0] + '.kml')
-            csv_to_kml(csv_file, kml_file)
+        if file_name.endswith(('.csv', '.parquet')):
+            csv_files.append(os.path.join(input_dir, file_name))
+            kml_files.append(os.path.join(input_dir, os.path.splitext(file_name)[0] + '.kml'))
+    # Convert the files in parallel across worker processes
+    with ProcessPoolExecutor() as executor:
+        futures = {executor.submit(csv_to_kml, csv_file, kml_file): (csv_file, kml_file)
+                   for csv_file, kml_file in zip(csv_files, kml_files)}
+        # Report files that fail without stopping the others
+        for future in as_completed(futures):
+            csv_file, kml_file = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print('Failed to convert {}: {}'.format(csv_file, e))
+                # Remove the incomplete KML file
+                if os.path.exists(kml_file):
+                    os.remove(kml_file)
 
-# Specify the directory containing your CSV files
-input_directory = r'YOUR DIRECTORY'
+if __name__ == '__main__':
+    # Specify the directory containing your CSV or Parquet files
+    input_directory = r'YOUR DIRECTORY'
 
-convert_csv_files_to_kml(input_directory)
\ No newline at end of file
+    convert_csv_files_to_kml(input_directory)
\ No newline at end of file
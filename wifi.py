@@ -1,19 +1,19 @@
-import datetime
 import os
 import re
 import time
 
-import pandas as pd
-import requests
+from wigle_client import WigleClient
 
 # Constants for coordinate validation
 MIN_LATITUDE, MAX_LATITUDE = -90, 90
 MIN_LONGITUDE, MAX_LONGITUDE = -180, 180
 
-# Constants for API requests
-BASE_URL = "https://api.wigle.net/api/v2/network/search"
-REQUEST_DELAY = 5
-MAX_RETRIES = 3
+# Patterns for input validation
+TOKEN_PATTERN = re.compile(r"[\w=-]*")
+NUMBER_PATTERN = re.compile(r"[-+]?(?:\d+(?:\.\d*)?|\.\d+)")
+
+# Endpoint for API requests
+ENDPOINT = "network/search"
 
 
 def is_valid_token(token):
@@ -26,7 +26,7 @@ def is_valid_token(token):
     Returns:
         bool: True if the token is valid, False otherwise.
     """
-    return bool(re.fullmatch(r"[\w\-_=]*", token))
+    return TOKEN_PATTERN.fullmatch(token) is not None
 
 
 def get_input(prompt, validation_func):
@@ -60,17 +60,15 @@ def get_coordinate(prompt, min_val, max_val):
         float: The coordinate if it is valid.
     """
     while True:
-        value = input(prompt)
-        try:
-            value = float(value)
-            if min_val <= value <= max_val:
-                return value
-            else:
-                print(
-                    f"Invalid input. Value should be between {min_val} and {max_val}."
-                )
-        except ValueError:
+        value = input(prompt).strip()
+        if not NUMBER_PATTERN.fullmatch(value):
             print("Invalid input. Please enter a number.")
+            continue
+
+        value = float(value)
+        if min_val <= value <= max_val:
+            return value
+        print(f"Invalid input. Value should be between {min_val} and {max_val}.")
 
 
 def get_coordinate_range(lower_prompt, upper_prompt, min_val, max_val):
@@ -122,79 +120,22 @@ def send_request(headers, latrange1, latrange2, longrange1, longrange2):
     Returns:
         None
     """
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = os.path.join("tests", f"{latrange1}_{longrange1}_{timestamp}.csv")
-
-    current_count = 0
-    total_count = None
-    retries = 0
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    filename = os.path.join("tests", f"{latrange1}_{longrange1}_{timestamp}.parquet")
 
-    query_params = {
-        "latrange1": latrange1,
-        "latrange2": latrange2,
-        "longrange1": longrange1,
-        "longrange2": longrange2,
-        "first": 100,
-    }
+    client = WigleClient(headers, ENDPOINT)
 
     print("Retrieving results...")
 
-    with open(filename, "a") as f:
-        while retries < MAX_RETRIES:
-            try:
-                response = requests.get(BASE_URL, params=query_params, headers=headers)
-                status_code = response.status_code
-
-                if status_code == 200:
-                    data = response.json()
-                    results = data["results"]
-                    current_count += len(results)
-
-                    if total_count is None:
-                        total_count = data["totalResults"]
-
-                    print(f"Retrieved {current_count} out of {total_count} results")
-
-                    df = pd.DataFrame(results)
-                    df.to_csv(f, index=False, header=f.tell() == 0, escapechar="\\")
-
-                    if current_count >= total_count:
-                        break
-
-                    query_params["start"] = current_count
-                    time.sleep(REQUEST_DELAY)
-
-                elif status_code == 401:
-                    print("Unauthorized. Check your API token.")
-                    break
-
-                elif status_code == 429:
-                    print("Too many requests. Saving the current results.")
-                    break
-
-                else:
-                    print(f"Error {status_code}: Failed to retrieve results.")
-                    break
-
-            except requests.exceptions.Timeout:
-                print("Request timed out. Retrying...")
-                retries += 1
-                time.sleep(REQUEST_DELAY)
-
-            except requests.exceptions.TooManyRedirects:
-                print("Too many redirects. Terminating request.")
-                break
-
-            except requests.exceptions.ConnectionError:
-                print("Connection Error. Retrying...")
-                retries += 1
-                time.sleep(REQUEST_DELAY)
-
-            except Exception as e:
-                print(f"An error occurred: {e}")
-                break
+    saved_count = client.save(
+        filename,
+        latrange1=latrange1,
+        latrange2=latrange2,
+        longrange1=longrange1,
+        longrange2=longrange2,
+    )
 
-        print(f"All results retrieved. Total results: {current_count}")
+    print(f"Finished. Total results saved: {saved_count}")
 
 
 def main():
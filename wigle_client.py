@@ -0,0 +1,380 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Constants for API requests
+BASE_URL = "https://api.wigle.net/api/v2/"
+REQUEST_DELAY = 5
+MAX_RETRIES = 3
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+PAGE_SIZE = 100
+MAX_CONCURRENT_REQUESTS = 4
+
+# Constants for writing results
+WRITE_BUFFER_SIZE = 2 << 20
+WRITE_BATCH_SIZE = 65536
+
+# Column types for the saved results
+COLUMN_TYPES = {
+    "trilat": pa.float32(),
+    "trilong": pa.float32(),
+    "qos": pa.int8(),
+    "transid": pa.string(),
+    "netid": pa.string(),
+    "ssid": pa.string(),
+}
+
+
+def build_table(results):
+    """
+    Build a table from a page of results, inferring the column types.
+
+    Columns whose values have mixed types are stored as strings.
+
+    Parameters:
+        results (list): The results to convert.
+
+    Returns:
+        pyarrow.Table: The results as a table.
+    """
+    names = dict.fromkeys(name for result in results for name in result)
+    columns = {}
+
+    for name in names:
+        values = [result.get(name) for result in results]
+        try:
+            columns[name] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            values = [None if value is None else str(value) for value in values]
+            columns[name] = pa.array(values, pa.string())
+
+    return pa.table(columns)
+
+
+def build_schema(results):
+    """
+    Build the schema used to save the results.
+
+    Columns listed in COLUMN_TYPES use those types, columns that are empty in the
+    given results are stored as strings, and the remaining types are inferred.
+
+    Parameters:
+        results (list): The results of the first page.
+
+    Returns:
+        pyarrow.Schema: The schema for the results.
+    """
+    schema = build_table(results).schema
+
+    for index, field in enumerate(schema):
+        if field.name in COLUMN_TYPES:
+            schema = schema.set(index, field.with_type(COLUMN_TYPES[field.name]))
+        elif pa.types.is_null(field.type):
+            schema = schema.set(index, field.with_type(pa.string()))
+
+    return schema
+
+
+def cast_value(value, type_):
+    """
+    Cast a single value to a column type.
+
+    Parameters:
+        value: The value to cast.
+        type_ (pyarrow.DataType): The type to cast to.
+
+    Returns:
+        The cast value, or None if it cannot be cast.
+    """
+    try:
+        return pa.array([value]).cast(type_)[0].as_py()
+    except pa.ArrowException:
+        return None
+
+
+def conform_table(table, schema):
+    """
+    Convert a table to the schema of the output file.
+
+    Columns are cast to the types in the schema. Values that cannot be cast are
+    stored as text in string columns and left empty in other columns. Columns
+    missing from the table are left empty, and columns not in the schema are
+    dropped.
+
+    Parameters:
+        table (pyarrow.Table): The table to convert.
+        schema (pyarrow.Schema): The schema of the output file.
+
+    Returns:
+        tuple: The converted table, and the names of the columns whose values
+        could not be saved.
+    """
+    columns = []
+    lost = [name for name in table.column_names if name not in schema.names]
+
+    for field in schema:
+        if field.name not in table.column_names:
+            columns.append(pa.nulls(table.num_rows, field.type))
+            continue
+
+        column = table[field.name]
+        try:
+            columns.append(column.cast(field.type))
+        except pa.ArrowException:
+            if pa.types.is_string(field.type):
+                values = [None if v is None else str(v) for v in column.to_pylist()]
+                columns.append(pa.array(values, pa.string()))
+            else:
+                values = [cast_value(v, field.type) for v in column.to_pylist()]
+                columns.append(pa.array(values, field.type))
+                lost.append(field.name)
+
+    return pa.Table.from_arrays(columns, schema=schema), lost
+
+
+def write_page(writer, results, lost_columns):
+    """
+    Append a page of results to the output file.
+
+    Parameters:
+        writer (pyarrow.parquet.ParquetWriter): The writer for the output file.
+        results (list): The results to write.
+        lost_columns (set): The columns already reported as not saved. Newly
+            affected columns are reported and added to it.
+
+    Returns:
+        int: The number of results written.
+    """
+    table, lost = conform_table(build_table(results), writer.schema)
+
+    for name in lost:
+        if name not in lost_columns:
+            lost_columns.add(name)
+            print(f"Warning: some values in column '{name}' could not be saved.")
+
+    writer.write_table(table)
+    return table.num_rows
+
+
+class WigleClient:
+    """
+    Client for a WiGLE API search endpoint.
+
+    A client keeps a single HTTPS session, so all of its requests reuse the same
+    pooled connections. Failed requests are retried by the session with
+    exponential backoff, honoring any Retry-After header.
+
+    Attributes:
+        session (requests.Session): The session used for the requests.
+        headers (dict): The headers sent with every request.
+        endpoint (str): The API endpoint to search, e.g. "network/search".
+    """
+
+    __slots__ = ("session", "headers", "endpoint")
+
+    def __init__(self, headers, endpoint):
+        """
+        Create a client for an API endpoint.
+
+        Parameters:
+            headers (dict): The headers to use for the requests.
+            endpoint (str): The API endpoint to search, relative to BASE_URL.
+        """
+        self.headers = headers
+        self.endpoint = endpoint
+
+        retry = Retry(
+            total=MAX_RETRIES,
+            backoff_factor=1,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry),
+        )
+        self.session.headers.update(headers)
+
+    @property
+    def url(self):
+        """
+        str: The full URL of the endpoint.
+        """
+        return BASE_URL + self.endpoint
+
+    def fetch_page(self, query_params, start, delay=0):
+        """
+        Fetch a single page of results from the WiGLE API.
+
+        Parameters:
+            query_params (dict): The query parameters to use for the request.
+            start (int): The offset of the first result to request.
+            delay (float): The time to wait after a successful request.
+
+        Returns:
+            dict: The response data, or None if the page could not be retrieved.
+        """
+        params = dict(query_params, first=PAGE_SIZE, start=start)
+
+        try:
+            response = self.session.get(self.url, params=params)
+            status_code = response.status_code
+
+            if status_code == 200:
+                data = orjson.loads(response.content)
+                time.sleep(delay)
+                return data
+
+            elif status_code == 401:
+                print("Unauthorized. Check your API token.")
+                return None
+
+            elif status_code == 429:
+                print("Too many requests. Saving the current results.")
+                return None
+
+            else:
+                print(f"Error {status_code}: Failed to retrieve results.")
+                return None
+
+        except requests.exceptions.TooManyRedirects:
+            print("Too many redirects. Terminating request.")
+            return None
+
+        except Exception as e:
+            print(f"An error occurred: {e}")
+            return None
+
+    def fetch(self, **query_params):
+        """
+        Fetch every page of results from the WiGLE API.
+
+        The first page is requested on its own to learn the total number of
+        results and the page size. The remaining pages are then requested
+        concurrently, with each worker waiting REQUEST_DELAY seconds after its
+        request to stay within the rate limit. If a page comes back shorter than
+        the first one before the end of the results, the offsets can no longer be
+        predicted, so the rest is fetched one page at a time. Fetching stops at
+        the first page that fails or has no results.
+
+        Parameters:
+            **query_params: The query parameters to use for the requests.
+
+        Yields:
+            dict: The response data for each page, in order.
+        """
+        data = self.fetch_page(query_params, 0)
+        if data is None or not data["results"]:
+            return
+        yield data
+
+        page_size = len(data["results"])
+        total_count = data["totalResults"]
+        next_start = page_size
+
+        starts = range(next_start, total_count, page_size)
+        fetch = partial(self.fetch_page, query_params, delay=REQUEST_DELAY)
+        pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS)
+
+        try:
+            for data in pool.map(fetch, starts):
+                if data is None or not data["results"]:
+                    return
+                yield data
+
+                next_start += len(data["results"])
+                if len(data["results"]) < page_size:
+                    break
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+        # Fall back to sequential paging after a short page
+        while next_start < total_count:
+            data = self.fetch_page(query_params, next_start, delay=REQUEST_DELAY)
+            if data is None or not data["results"]:
+                return
+            yield data
+
+            next_start += len(data["results"])
+
+    def save(self, filename, **query_params):
+        """
+        Fetch every page of results and save them to a Parquet file.
+
+        Each page is written on a background thread while the next one is
+        fetched. The results retrieved so far are kept if the search is
+        interrupted, and only pages that were written are counted.
+
+        Parameters:
+            filename (str): The path of the Parquet file to write.
+            **query_params: The query parameters to use for the requests.
+
+        Returns:
+            int: The number of results saved.
+        """
+        current_count = 0
+        saved_count = 0
+        sink = None
+        writer = None
+        write = None
+        lost_columns = set()
+        write_pool = ThreadPoolExecutor(max_workers=1)
+
+        try:
+            for data in self.fetch(**query_params):
+                results = data["results"]
+                total_count = data["totalResults"]
+                current_count += len(results)
+
+                print(f"Retrieved {current_count} out of {total_count} results")
+
+                if writer is None:
+                    # Arrow's own file I/O releases the GIL while writing
+                    sink = pa.BufferedOutputStream(
+                        pa.OSFile(filename, "wb"), buffer_size=WRITE_BUFFER_SIZE
+                    )
+                    writer = pq.ParquetWriter(
+                        sink,
+                        build_schema(results),
+                        compression="snappy",
+                        use_dictionary=True,
+                        write_batch_size=WRITE_BATCH_SIZE,
+                    )
+
+                # Write this page in the background while the next one is fetched
+                if write is not None:
+                    saved_count += write.result()
+                write = write_pool.submit(write_page, writer, results, lost_columns)
+
+            if write is not None:
+                saved_count += write.result()
+                write = None
+
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+        finally:
+            write_pool.shutdown(wait=True)
+
+            # Count a page that was still being written when the loop ended
+            if write is not None and not write.cancelled():
+                if write.exception() is None:
+                    saved_count += write.result()
+
+            if writer is not None:
+                writer.close()
+            if sink is not None:
+                sink.close()
+
+        return saved_count